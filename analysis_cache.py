@@ -0,0 +1,39 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        """Thread-safe LRU of recent /analyze results, expiring after `ttl` seconds."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def key(keyword: str, temperature: float, instructions_version: str) -> Tuple:
+        """Cache key for one analysis request."""
+        return (keyword.strip().lower(), round(temperature, 3), instructions_version)
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """Return the cached results for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return results
+
+    def put(self, key: Tuple, results: Dict):
+        """Store results, evicting the least recently used entries beyond the limit."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,117 +1,209 @@
-from flask import Flask, render_template, request, jsonify
-from title_analyzer import TitleAnalyzer
+from flask import Flask, Blueprint, Response, current_app, render_template, request, jsonify
+from title_analyzer import TitleAnalyzer, is_generated_title
+from instruction_store import InstructionStore
+from analysis_cache import AnalysisCache
+from response_options import parse_options, shape_payload, make_etag, choose_encoding, compress_body
 import os
+import sys
+import atexit
+import weakref
 from dotenv import load_dotenv
 
-# Load environment variables
-print("\nLoading environment variables...")
-load_dotenv()
+bp = Blueprint('main', __name__)
 
-app = Flask(__name__)
+def get_analyzer() -> TitleAnalyzer:
+    """Return the analyzer shared by every request in this process."""
+    return current_app.extensions['title_analyzer']
 
-# Get API keys from environment variables
-openai_key = os.getenv('OPENAI_API_KEY')
-anthropic_key = os.getenv('ANTHROPIC_API_KEY')
+def get_instruction_store() -> InstructionStore:
+    """Return the in-memory instruction template store."""
+    return current_app.extensions['instruction_store']
 
-print("\n=== Environment Variables ===")
-print(f"OPENAI_API_KEY: {'Present (length: ' + str(len(openai_key)) + ')' if openai_key else 'Not found'}")
-print(f"ANTHROPIC_API_KEY: {'Present (length: ' + str(len(anthropic_key)) + ')' if anthropic_key else 'Not found'}")
+def get_analysis_cache() -> AnalysisCache:
+    """Return the cache of recent analysis results used for conditional requests."""
+    return current_app.extensions['analysis_cache']
 
-print("\n=== API Key Status ===")
-print(f"OpenAI API Key present: {'Yes' if openai_key else 'No'}")
-print(f"Anthropic API Key present: {'Yes' if anthropic_key else 'No'}")
+def make_analysis_response(response: dict, top_k, fields) -> Response:
+    """Serialize, tag and compress an /analyze payload.
 
-if not openai_key and not anthropic_key:
-    print("Error: Neither OPENAI_KEY nor ANTHROPIC_API_KEY found. Please set at least one API key in your .env file")
-    exit(1)
+    For GET/HEAD requests a matching If-None-Match is answered with 304. Other
+    methods ignore it, since RFC 9110 only allows 304 for GET and HEAD.
+    """
+    body = current_app.json.dumps(shape_payload(response, top_k, fields)).encode('utf-8')
+    # Each content-coding is a separate representation, so it gets its own tag
+    encoding = choose_encoding(body, request.accept_encodings)
+    etag = make_etag(body, encoding)
 
-# Initialize analyzer with available keys
-analyzer = TitleAnalyzer(openai_key, anthropic_key)
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        not_modified.vary.add('Accept-Encoding')
+        return not_modified
 
-# Print available services
-print("\nAvailable AI Services:")
-if openai_key:
-    print("✓ GPT-4")
-if anthropic_key:
-    print("✓ Claude")
-print()
+    result = Response(compress_body(body, encoding), mimetype='application/json')
+    result.set_etag(etag)
+    result.vary.add('Accept-Encoding')
+    if encoding:
+        result.headers['Content-Encoding'] = encoding
+    return result
 
-def load_instructions():
-    try:
-        with open('current_instructions.txt', 'r') as f:
-            return f.read()
-    except FileNotFoundError:
-        try:
-            with open('default_instructions.txt', 'r') as f:
-                return f.read()
-        except FileNotFoundError:
-            return """Create a unique and engaging title tag (max 75 characters) that:
-1. Incorporates 2-3 of the most relevant common terms
-2. Adds a unique angle or perspective
-3. Maintains search intent
-4. Includes the main keyword naturally
-5. Avoid using dates and/or years"""
-
-def save_instructions(instructions):
-    with open('current_instructions.txt', 'w') as f:
-        f.write(instructions)
-
-@app.route('/')
+@bp.route('/')
 def index():
-    instructions = load_instructions()
+    instructions = get_instruction_store().current().text
     return render_template('index.html', instructions=instructions)
 
-@app.route('/analyze', methods=['POST'])
+@bp.route('/analyze', methods=['GET'])
+def cached_analysis():
+    """Fetch a cached analysis without re-running it; supports If-None-Match revalidation."""
+    keyword = request.args.get('keyword', '')
+    try:
+        temperature = float(request.args.get('temperature', 0.4))
+        top_k, fields = parse_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Defaults to the instructions a POST would currently use
+    version = request.args.get('instructions_version') or get_instruction_store().current().version
+    cached = get_analysis_cache().get(AnalysisCache.key(keyword, temperature, version))
+    if cached is None:
+        return jsonify({"error": "No cached analysis for these parameters; POST to /analyze to run one"}), 404
+    return make_analysis_response(cached, top_k, fields)
+
+@bp.route('/analyze', methods=['POST'])
 def analyze():
     print("\n=== New Analysis Request ===")
     keyword = request.form.get('keyword', '')
     temperature = float(request.form.get('temperature', 0.4))
     instructions = request.form.get('instructions', '')
-    
+
+    try:
+        top_k, fields = parse_options(request.values)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     print(f"Keyword: {keyword}")
     print(f"Temperature: {temperature}")
-    
+
     # Save instructions if they differ from default
-    try:
-        with open('default_instructions.txt', 'r') as f:
-            default_instructions = f.read()
-            if instructions != default_instructions:
-                save_instructions(instructions)
-    except FileNotFoundError:
-        save_instructions(instructions)
-    
-    results = analyzer.run_analysis(keyword, temperature, instructions)
-    
+    store = get_instruction_store()
+    template = store.default()
+    if instructions != template.text:
+        template = store.save('current', instructions)
+
+    cache = get_analysis_cache()
+    cache_key = cache.key(keyword, temperature, template.version)
+
+    results = get_analyzer().run_analysis(keyword, temperature, instructions)
+
     # Debug print results
     print("\nResults received:")
     print(f"GPT-4 Title: {'Available' if 'gpt4_title' in results else 'Not available'}")
     print(f"Claude Title: {'Available' if 'claude_title' in results else 'Not available'}")
-    
+
     # Only include available AI results
     response = {
         "keyword": results["keyword"],
         "num_titles_analyzed": results["num_titles_analyzed"],
+        "num_duplicates_merged": results["num_duplicates_merged"],
         "top_terms": results["top_terms"],
         "term_frequency": results["term_frequency"],
-        "analyzed_titles": results["analyzed_titles"]
+        "analyzed_titles": results["analyzed_titles"],
+        "instructions_version": template.version
     }
-    
+
     if results["gpt4_title"] != "OpenAI API key not provided":
         response["gpt4_title"] = results["gpt4_title"]
-    
+
     if results["claude_title"] != "Anthropic API key not provided":
         response["claude_title"] = results["claude_title"]
-    
-    return jsonify(response)
 
-@app.route('/reset-instructions', methods=['POST'])
+    # Don't let GET /analyze replay an empty scrape or a failed generation
+    titles = [response[key] for key in ("gpt4_title", "claude_title") if key in response]
+    if response["num_titles_analyzed"] > 0 and all(is_generated_title(title) for title in titles):
+        cache.put(cache_key, response)
+    return make_analysis_response(response, top_k, fields)
+
+@bp.route('/reset-instructions', methods=['POST'])
 def reset_instructions():
-    try:
-        with open('default_instructions.txt', 'r') as f:
-            default_instructions = f.read()
-            return jsonify({"instructions": default_instructions})
-    except FileNotFoundError:
+    template = get_instruction_store().get('default')
+    if template is None:
         return jsonify({"error": "Default instructions file not found"}), 404
+    return jsonify({"instructions": template.text, "instructions_version": template.version})
+
+def create_app(config: dict = None, analyzer: TitleAnalyzer = None) -> Flask:
+    """Build the Flask app with one thread-safe TitleAnalyzer shared across requests.
+
+    API keys come from `config` (OPENAI_API_KEY / ANTHROPIC_API_KEY) or the
+    environment. Pass `analyzer` to serve with a pre-built or stand-in analyzer.
+    """
+    # Load environment variables
+    print("\nLoading environment variables...")
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config.from_mapping(
+        OPENAI_API_KEY=os.getenv('OPENAI_API_KEY'),
+        ANTHROPIC_API_KEY=os.getenv('ANTHROPIC_API_KEY'),
+        INSTRUCTIONS_DIR=os.getcwd(),
+        INSTRUCTIONS_CHECK_INTERVAL=2.0,
+        ANALYSIS_CACHE_SIZE=256,
+        ANALYSIS_CACHE_TTL=3600,
+        SERP_LOCALE=os.getenv('SERP_LOCALE', 'en'),
+        EXCLUSION_RULES_PATH=os.getenv('EXCLUSION_RULES_PATH'),
+    )
+    if config:
+        app.config.update(config)
+
+    if analyzer is None:
+        openai_key = app.config['OPENAI_API_KEY']
+        anthropic_key = app.config['ANTHROPIC_API_KEY']
+
+        print("\n=== API Key Status ===")
+        print(f"OpenAI API Key present: {'Yes' if openai_key else 'No'}")
+        print(f"Anthropic API Key present: {'Yes' if anthropic_key else 'No'}")
+
+        if not openai_key and not anthropic_key:
+            raise RuntimeError("Neither OPENAI_API_KEY nor ANTHROPIC_API_KEY found. Please set at least one API key in your .env file")
+
+        # Initialize analyzer with available keys
+        analyzer = TitleAnalyzer(
+            openai_key,
+            anthropic_key,
+            locale=app.config['SERP_LOCALE'],
+            exclusion_rules_path=app.config['EXCLUSION_RULES_PATH']
+        )
+
+        # Close browsers and API connections when the worker exits. The hook
+        # holds a weak reference so it doesn't keep a discarded analyzer alive;
+        # analyzers passed in are closed by whoever built them.
+        close_ref = weakref.WeakMethod(analyzer.close)
+        atexit.register(lambda: close_ref() and close_ref()())
+
+        # Print available services
+        print("\nAvailable AI Services:")
+        if openai_key:
+            print("✓ GPT-4")
+        if anthropic_key:
+            print("✓ Claude")
+        print()
+
+    app.extensions['title_analyzer'] = analyzer
+    app.extensions['instruction_store'] = InstructionStore(
+        app.config['INSTRUCTIONS_DIR'],
+        app.config['INSTRUCTIONS_CHECK_INTERVAL']
+    )
+    app.extensions['analysis_cache'] = AnalysisCache(
+        app.config['ANALYSIS_CACHE_SIZE'],
+        app.config['ANALYSIS_CACHE_TTL']
+    )
+    app.register_blueprint(bp)
+
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001) 
\ No newline at end of file
+    try:
+        app = create_app()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    app.run(debug=True, port=5001, threaded=True)
@@ -0,0 +1,5 @@
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+# ASGI entry point, e.g. `uvicorn asgi:app --workers 4`
+app = WsgiToAsgi(create_app())
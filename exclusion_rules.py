@@ -0,0 +1,122 @@
+import re
+import json
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+RULE_KINDS = ('exact', 'prefix', 'regex')
+
+# Global inline flags like "(?i)" are only legal at the start of the combined pattern
+GLOBAL_FLAGS = re.compile(r'\(\?[aiLmsux]+\)')
+
+# Numbered backreferences like \1 and conditionals like (?(1)...) point at the
+# wrong group once the rule is wrapped in the combined pattern
+BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]|\(\?\(')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace, since SERP widget headings often span lines."""
+    return ' '.join(text.lower().split())
+
+
+class ExclusionRules:
+    def __init__(self, rules: Dict[str, List[str]]):
+        """Compile exact, prefix and regex rules into a single anchored regex.
+
+        Each rule gets its own named group so a match reports which rule fired.
+        Exact rules are tried first, then prefixes, then patterns. Every rule is
+        matched from the start of the normalized (lowercased) title.
+        """
+        self.rule_ids: Dict[str, str] = {}
+        alternatives = []
+        seen = set()
+        for kind in RULE_KINDS:
+            for value in rules.get(kind, []):
+                if kind == 'prefix':
+                    # Keep a trailing space so "results for " doesn't match "results format"
+                    value = normalize(value) + (' ' if value[-1:].isspace() else '')
+                elif kind == 'exact':
+                    value = normalize(value)
+                if not value or (kind, value) in seen:
+                    continue
+                seen.add((kind, value))
+
+                if kind == 'exact':
+                    pattern = re.escape(value) + r'\Z'
+                elif kind == 'prefix':
+                    pattern = re.escape(value)
+                else:
+                    pattern = f"(?:{self._check_regex(value)})"
+
+                group = f"r{len(self.rule_ids)}"
+                self.rule_ids[group] = f"{kind}:{value}"
+                alternatives.append(f"(?P<{group}>{pattern})")
+
+        try:
+            self._matcher = re.compile('|'.join(alternatives)) if alternatives else None
+        except re.error as e:
+            raise ValueError(f"Exclusion rules failed to compile together: {e}")
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    @staticmethod
+    def _check_regex(value: str) -> str:
+        """Reject regex rules that can't be embedded in the combined pattern."""
+        if GLOBAL_FLAGS.search(value):
+            raise ValueError(f"Invalid exclusion regex {value!r}: global inline flags are not allowed (titles are already lowercased; use a scoped group like (?i:...))")
+        if BACKREFERENCE.search(value):
+            raise ValueError(f"Invalid exclusion regex {value!r}: backreferences and group conditionals are not allowed")
+        try:
+            compiled = re.compile(value)
+        except re.error as e:
+            raise ValueError(f"Invalid exclusion regex {value!r}: {e}")
+        if compiled.groupindex:
+            raise ValueError(f"Invalid exclusion regex {value!r}: named groups are not allowed")
+        return value
+
+    @classmethod
+    def load(cls, path: str, locale: str = None) -> 'ExclusionRules':
+        """Load the default rules from a JSON config, plus any rules for `locale`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        rules = {kind: list(config.get('default', {}).get(kind, [])) for kind in RULE_KINDS}
+        if locale:
+            locale_rules = config.get('locales', {}).get(locale.lower(), {})
+            for kind in RULE_KINDS:
+                rules[kind].extend(locale_rules.get(kind, []))
+        return cls(rules)
+
+    def _match(self, text: str) -> Optional[str]:
+        if self._matcher is None:
+            return None
+        match = self._matcher.match(normalize(text))
+        return self.rule_ids[match.lastgroup] if match else None
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the id of the rule that excludes `text`, or None, counting the hit."""
+        rule = self._match(text)
+        if rule:
+            with self._lock:
+                self._counts[rule] += 1
+        return rule
+
+    def filter(self, titles: List[str]) -> Tuple[List[str], Counter]:
+        """Split a batch of titles in one pass; returns the kept titles and per-rule drop counts."""
+        kept = []
+        dropped = Counter()
+        for title in titles:
+            rule = self._match(title)
+            if rule:
+                dropped[rule] += 1
+            else:
+                kept.append(title)
+
+        with self._lock:
+            self._counts.update(dropped)
+        return kept, dropped
+
+    def stats(self) -> Dict[str, int]:
+        """Cumulative number of titles dropped by each rule."""
+        with self._lock:
+            return dict(self._counts.most_common())
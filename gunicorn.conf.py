@@ -0,0 +1,15 @@
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5001')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('THREADS', 4))
+# Scrapes and LLM calls routinely take longer than gunicorn's 30s default
+timeout = int(os.getenv('TIMEOUT', 300))
+graceful_timeout = 30
+
+def worker_exit(server, worker):
+    """Close browsers and API connections held by the exiting worker."""
+    app = getattr(worker, 'wsgi', None)
+    analyzer = getattr(app, 'extensions', {}).get('title_analyzer')
+    if analyzer is not None:
+        analyzer.close()
@@ -0,0 +1,92 @@
+import os
+import time
+import hashlib
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from file_utils import atomic_write
+
+FALLBACK_INSTRUCTIONS = """Create a unique and engaging title tag (max 75 characters) that:
+1. Incorporates 2-3 of the most relevant common terms
+2. Adds a unique angle or perspective
+3. Maintains search intent
+4. Includes the main keyword naturally
+5. Avoid using dates and/or years"""
+
+
+class PromptTemplate(NamedTuple):
+    name: str
+    text: str
+    version: str
+
+
+def template_version(text: str) -> str:
+    """Content hash identifying one version of an instructions template."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class InstructionStore:
+    def __init__(self, directory: str = '.', check_interval: float = 2.0):
+        """Keep instruction templates in memory, reloading a file only when its mtime changes.
+
+        Files are named `<name>_instructions.txt` inside `directory`. Each file is
+        stat'ed at most once per `check_interval` seconds, so steady-state reads
+        are served from memory.
+        """
+        self.directory = directory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # name -> (mtime_ns or None if missing, template or None, last checked)
+        self._entries: Dict[str, tuple] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}_instructions.txt")
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """Return the named template, or None if its file does not exist."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - entry[2] < self.check_interval:
+                return entry[1]
+
+            path = self._path(name)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+
+            if entry is not None and entry[0] == mtime:
+                template = entry[1]
+            elif mtime is None:
+                template = None
+            else:
+                print(f"Loading instructions from {path}")
+                with open(path, 'r') as f:
+                    text = f.read()
+                template = PromptTemplate(name, text, template_version(text))
+
+            self._entries[name] = (mtime, template, now)
+            return template
+
+    def current(self) -> PromptTemplate:
+        """Return the saved instructions, falling back to the defaults."""
+        return self.get('current') or self.default()
+
+    def default(self) -> PromptTemplate:
+        """Return the default instructions, or the built-in text if the file is missing."""
+        return self.get('default') or PromptTemplate('default', FALLBACK_INSTRUCTIONS, template_version(FALLBACK_INSTRUCTIONS))
+
+    def save(self, name: str, text: str) -> PromptTemplate:
+        """Atomically write a template, skipping the write if the content is unchanged."""
+        template = PromptTemplate(name, text, template_version(text))
+        existing = self.get(name)
+        if existing is not None and existing.version == template.version:
+            return existing
+
+        path = self._path(name)
+        with self._lock:
+            atomic_write(path, text)
+            mtime = os.stat(path).st_mtime_ns
+            self._entries[name] = (mtime, template, time.monotonic())
+        return template
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from file_utils import atomic_write
+from instruction_store import InstructionStore
+from title_analyzer import split_title, is_generated_title
+
+# Retry a failed scrape after this long at most, instead of on every poll
+FAILURE_BACKOFF_SECONDS = 3600
+
+# Providers without an API key never produce a title; that isn't a failure
+NOT_CONFIGURED_TITLES = {"OpenAI API key not provided", "Anthropic API key not provided"}
+
+
+def generation_succeeded(results: Dict) -> bool:
+    """True if every configured provider returned a real title."""
+    attempted = [
+        results.get(key) for key in ("gpt4_title", "claude_title")
+        if results.get(key) not in NOT_CONFIGURED_TITLES
+    ]
+    return bool(attempted) and all(is_generated_title(title) for title in attempted)
+
+
+def serp_fingerprint(results: Dict) -> Dict:
+    """Compact fingerprint of a SERP: ordered domains, hashed titles and top terms."""
+    entries = []
+    for title in results["analyzed_titles"]:
+        text, domain = split_title(title)
+        title_hash = hashlib.sha1(' '.join(text.lower().split()).encode('utf-8')).hexdigest()[:12]
+        entries.append({"domain": domain, "title_hash": title_hash})
+
+    top_terms = list(results["top_terms"])
+    digest = hashlib.sha256(json.dumps([entries, top_terms]).encode('utf-8')).hexdigest()[:16]
+    return {"results": entries, "top_terms": top_terms, "digest": digest}
+
+
+def diff_fingerprints(old: Dict, new: Dict, move_tolerance: int = 2) -> Dict:
+    """Compare two SERP fingerprints and score how much the SERP changed (0.0 - 1.0)."""
+    def positions(fingerprint: Dict) -> Dict[Tuple[str, str], int]:
+        ranks = {}
+        for rank, entry in enumerate(fingerprint["results"]):
+            ranks.setdefault((entry["domain"], entry["title_hash"]), rank)
+        return ranks
+
+    old_ranks, new_ranks = positions(old), positions(new)
+    new_results = [key for key in new_ranks if key not in old_ranks]
+    dropped_results = [key for key in old_ranks if key not in new_ranks]
+    moved_results = [
+        (key, old_ranks[key], new_ranks[key]) for key in new_ranks
+        if key in old_ranks and abs(new_ranks[key] - old_ranks[key]) > move_tolerance
+    ]
+
+    old_terms, new_terms = old["top_terms"], new["top_terms"]
+    terms_added = [term for term in new_terms if term not in old_terms]
+    terms_removed = [term for term in old_terms if term not in new_terms]
+
+    # Moves count half as much as results entering or leaving
+    result_change = (len(new_results) + len(dropped_results) + 0.5 * len(moved_results)) / max(len(old_ranks), len(new_ranks), 1)
+    term_change = len(terms_added) / max(len(old_terms), len(new_terms), 1)
+
+    return {
+        "new_results": [domain for domain, _ in new_results],
+        "dropped_results": [domain for domain, _ in dropped_results],
+        "moved_results": [{"domain": domain, "from": before + 1, "to": after + 1} for (domain, _), before, after in moved_results],
+        "terms_added": terms_added,
+        "terms_removed": terms_removed,
+        "score": round(min(1.0, max(result_change, term_change)), 3)
+    }
+
+
+class KeywordTracker:
+    def __init__(self, analyzer, store_path: str = 'tracked_keywords.json',
+                 instruction_store: InstructionStore = None, threshold: float = 0.2):
+        """Re-check tracked keywords on a schedule, regenerating titles only when the SERP changed enough."""
+        self.analyzer = analyzer
+        self.store_path = store_path
+        self.instruction_store = instruction_store or InstructionStore()
+        self.threshold = threshold
+        self.keywords = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.store_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self):
+        """Atomically write the tracked keyword state."""
+        atomic_write(self.store_path, json.dumps(self.keywords, indent=2))
+
+    def track(self, keyword: str, interval_hours: float = 24, temperature: float = 0.4):
+        """Start tracking a keyword, or update its schedule."""
+        entry = self.keywords.setdefault(keyword, {"fingerprint": None, "last_checked": 0, "titles": {}})
+        entry["interval_hours"] = interval_hours
+        entry["temperature"] = temperature
+        self._save()
+
+    def untrack(self, keyword: str):
+        """Stop tracking a keyword."""
+        if self.keywords.pop(keyword, None) is not None:
+            self._save()
+
+    def due_keywords(self, now: float = None) -> List[str]:
+        """Keywords whose re-check interval, or failure backoff, has elapsed."""
+        now = now or time.time()
+        due = []
+        for keyword, entry in self.keywords.items():
+            interval = entry["interval_hours"] * 3600
+            last_failed = entry.get("last_failed", 0)
+            if last_failed > entry["last_checked"]:
+                # The last scrape failed (e.g. a captcha); back off rather than retry every poll
+                if now - last_failed >= min(interval, FAILURE_BACKOFF_SECONDS):
+                    due.append(keyword)
+            elif now - entry["last_checked"] >= interval:
+                due.append(keyword)
+        return due
+
+    def check(self, keyword: str, force: bool = False) -> Optional[Dict]:
+        """Re-scrape one keyword and regenerate titles if the SERP or instructions changed."""
+        entry = self.keywords[keyword]
+        results = self.analyzer.analyze_serp(keyword)
+        if not results["analyzed_titles"]:
+            # Keep the previous fingerprint so a failed scrape doesn't count as a change
+            entry["last_failed"] = time.time()
+            self._save()
+            print(f"No results scraped for '{keyword}', will retry later")
+            return None
+
+        fingerprint = serp_fingerprint(results)
+        template = self.instruction_store.current()
+
+        # Diff against the SERP the current titles were generated from, so
+        # small daily shifts still add up to a regeneration eventually
+        if entry["fingerprint"] is None:
+            diff = None
+            reason = "first check"
+        else:
+            diff = diff_fingerprints(entry["fingerprint"], fingerprint)
+            if force:
+                reason = "forced"
+            elif diff["score"] >= self.threshold:
+                reason = f"SERP change {diff['score']:.2f} >= {self.threshold:.2f}"
+            elif entry.get("instructions_version") != template.version:
+                reason = "instructions changed"
+            else:
+                reason = None
+
+        if reason:
+            print(f"Regenerating titles for '{keyword}' ({reason})")
+            results = self.analyzer.generate_titles(results, entry["temperature"], template.text)
+            if not generation_succeeded(results):
+                # Leave the fingerprint and titles alone so the keyword is retried after the backoff
+                entry["last_failed"] = time.time()
+                self._save()
+                print(f"Title generation failed for '{keyword}', will retry later")
+                return {"keyword": keyword, "regenerated": False, "reason": "generation failed", "diff": diff, "titles": entry["titles"]}
+            entry["titles"] = {
+                "gpt4_title": results["gpt4_title"],
+                "claude_title": results["claude_title"]
+            }
+            entry["instructions_version"] = template.version
+            entry["fingerprint"] = fingerprint
+            entry["last_generated"] = time.time()
+        else:
+            print(f"SERP for '{keyword}' changed {diff['score']:.2f} < {self.threshold:.2f}, keeping existing titles")
+
+        entry["last_digest"] = fingerprint["digest"]
+        entry["last_checked"] = time.time()
+        entry["last_diff"] = diff
+        self._save()
+
+        return {"keyword": keyword, "regenerated": bool(reason), "reason": reason, "diff": diff, "titles": entry["titles"]}
+
+    def run_due(self) -> List[Dict]:
+        """Check every keyword that is due."""
+        reports = []
+        for keyword in self.due_keywords():
+            try:
+                report = self.check(keyword)
+            except Exception as e:
+                print(f"Error checking '{keyword}': {e}")
+                continue
+            if report:
+                reports.append(report)
+        return reports
+
+    def run_forever(self, poll_interval: float = 300):
+        """Run due checks, then sleep, until interrupted."""
+        print(f"Tracking {len(self.keywords)} keywords (polling every {poll_interval:.0f}s)")
+        while True:
+            reports = self.run_due()
+            if reports:
+                regenerated = sum(1 for report in reports if report["regenerated"])
+                print(f"Checked {len(reports)} keywords, regenerated {regenerated}")
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track keywords and regenerate titles only when their SERP changes")
+    parser.add_argument('--store', default='tracked_keywords.json', help="Tracked keyword state file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Minimum SERP change score (0-1) that triggers regeneration")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('add', help="Track a keyword")
+    add.add_argument('keyword')
+    add.add_argument('--interval-hours', type=float, default=24)
+    add.add_argument('--temperature', type=float, default=0.4)
+
+    remove = subparsers.add_parser('remove', help="Stop tracking a keyword")
+    remove.add_argument('keyword')
+
+    subparsers.add_parser('list', help="List tracked keywords")
+
+    check = subparsers.add_parser('check', help="Check one keyword now")
+    check.add_argument('keyword')
+    check.add_argument('--force', action='store_true', help="Regenerate titles regardless of change")
+
+    run = subparsers.add_parser('run', help="Run the scheduler")
+    run.add_argument('--poll-interval', type=float, default=300)
+    run.add_argument('--once', action='store_true', help="Check due keywords once and exit")
+
+    args = parser.parse_args()
+
+    # Commands that don't scrape don't need a browser or API clients
+    analyzer = None
+    if args.command in ('check', 'run'):
+        from title_analyzer import TitleAnalyzer
+        load_dotenv()
+        analyzer = TitleAnalyzer(os.getenv('OPENAI_API_KEY'), os.getenv('ANTHROPIC_API_KEY'))
+
+    tracker = KeywordTracker(analyzer, args.store, threshold=args.threshold)
+
+    try:
+        if args.command == 'add':
+            tracker.track(args.keyword, args.interval_hours, args.temperature)
+            print(f"Tracking '{args.keyword}' every {args.interval_hours:g}h")
+        elif args.command == 'remove':
+            tracker.untrack(args.keyword)
+            print(f"Stopped tracking '{args.keyword}'")
+        elif args.command == 'list':
+            for keyword, entry in tracker.keywords.items():
+                checked = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry["last_checked"])) if entry["last_checked"] else 'never'
+                print(f"{keyword}: every {entry['interval_hours']:g}h, last checked {checked}")
+        elif args.command == 'check':
+            if args.keyword not in tracker.keywords:
+                tracker.track(args.keyword)
+            print(json.dumps(tracker.check(args.keyword, force=args.force), indent=2))
+        elif args.command == 'run':
+            try:
+                if args.once:
+                    tracker.run_due()
+                else:
+                    tracker.run_forever(args.poll_interval)
+            except KeyboardInterrupt:
+                print("\nStopping tracker")
+    finally:
+        if analyzer is not None:
+            analyzer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import os
+import sys
+import time
+import shutil
+import socket
+import tempfile
+import random
+import argparse
+import subprocess
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+class StubAnalyzer:
+    """Local stand-in for TitleAnalyzer that sleeps instead of scraping and calling LLMs."""
+
+    def __init__(self, scrape_delay: float = 0.05, llm_delay: float = 0.05, num_titles: int = 100):
+        self.scrape_delay = scrape_delay
+        self.llm_delay = llm_delay
+        self.num_titles = num_titles
+
+    def run_analysis(self, keyword: str, temperature: float = 0.4, instructions: str = None) -> Dict:
+        time.sleep(self.scrape_delay)
+        # Deterministic pseudo-SERP with a realistic spread of distinct terms
+        rng = random.Random(keyword)
+        vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10))) for _ in range(600)]
+        titles = [
+            f"{keyword} {' '.join(rng.choice(vocabulary) for _ in range(8))} (example{i}.com)"
+            for i in range(self.num_titles)
+        ]
+        term_frequency = {}
+        for title in titles:
+            for term in title.split(' (')[0].split():
+                term_frequency[term] = term_frequency.get(term, 0) + 1
+        top_terms = sorted(term_frequency, key=term_frequency.get, reverse=True)[:10]
+        # One simulated call per LLM provider
+        time.sleep(self.llm_delay * 2)
+        return {
+            "keyword": keyword,
+            "num_titles_analyzed": len(titles),
+            "num_duplicates_merged": 0,
+            "top_terms": top_terms,
+            "term_frequency": term_frequency,
+            "gpt4_title": f"Stub GPT-4 title for {keyword}",
+            "claude_title": f"Stub Claude title for {keyword}",
+            "analyzed_titles": titles
+        }
+
+    def close(self):
+        pass
+
+def make_instructions_dir() -> str:
+    """Temp directory holding a copy of the default instructions, so benchmarks never write to the working tree."""
+    directory = tempfile.mkdtemp(prefix='title_analyzer_bench_')
+    if os.path.exists('default_instructions.txt'):
+        shutil.copy('default_instructions.txt', directory)
+    return directory
+
+def default_instructions(directory: str) -> str:
+    """The default instructions text; posting it means /analyze has nothing to save."""
+    from instruction_store import InstructionStore
+    return InstructionStore(directory).default().text
+
+def create_stub_app(instructions_dir: str = None):
+    """App factory used by the gunicorn workers started from this script."""
+    from app import create_app
+    scrape_delay = float(os.getenv('STUB_SCRAPE_DELAY', 0.05))
+    llm_delay = float(os.getenv('STUB_LLM_DELAY', 0.05))
+    instructions_dir = instructions_dir or os.getenv('STUB_INSTRUCTIONS_DIR') or make_instructions_dir()
+    return create_app({'INSTRUCTIONS_DIR': instructions_dir}, analyzer=StubAnalyzer(scrape_delay, llm_delay))
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for_server(url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+def measure(url: str, concurrency: int, duration: float, instructions: str) -> Dict:
+    """Hammer /analyze from `concurrency` threads for `duration` seconds."""
+    body = urllib.parse.urlencode({'keyword': 'running shoes', 'temperature': 0.4, 'instructions': instructions}).encode()
+    deadline = time.time() + duration
+
+    def client() -> List[float]:
+        latencies = []
+        while time.time() < deadline:
+            start = time.time()
+            with urllib.request.urlopen(f"{url}/analyze", data=body, timeout=60) as response:
+                response.read()
+            latencies.append(time.time() - start)
+        return latencies
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [l for result in pool.map(lambda _: client(), range(concurrency)) for l in result]
+    elapsed = time.time() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+    }
+
+def run_with_workers(workers: int, threads: int, concurrency: int, duration: float) -> Dict:
+    """Start gunicorn with the stub app and measure throughput."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    instructions_dir = make_instructions_dir()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--preload',
+         '--workers', str(workers), '--threads', str(threads),
+         '--bind', f"127.0.0.1:{port}", '--log-level', 'warning',
+         'load_test:create_stub_app()'],
+        stdout=subprocess.DEVNULL,
+        env={**os.environ, 'STUB_INSTRUCTIONS_DIR': instructions_dir}
+    )
+    try:
+        wait_for_server(url)
+        return measure(url, concurrency, duration, default_instructions(instructions_dir))
+    finally:
+        # SIGTERM exercises the graceful shutdown path
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(instructions_dir, ignore_errors=True)
+
+def report_payload_sizes():
+    """Print /analyze payload sizes for each response option."""
+    from app import create_app
+    instructions_dir = make_instructions_dir()
+    app = create_app({'INSTRUCTIONS_DIR': instructions_dir}, analyzer=StubAnalyzer(0, 0))
+    try:
+        client = app.test_client()
+        instructions = default_instructions(instructions_dir)
+        form = {'keyword': 'running shoes', 'temperature': 0.4, 'instructions': instructions}
+
+        def fetch(query: str = '', headers: Dict = None):
+            return client.post(f"/analyze{query}", data=form, headers=headers or {})
+
+        baseline = fetch()
+        etag = baseline.headers['ETag']
+        cases = [
+            ("full (baseline)", fetch()),
+            ("top_k=20", fetch('?top_k=20')),
+            ("fields=titles only", fetch('?fields=keyword,top_terms,gpt4_title,claude_title')),
+            ("gzip", fetch(headers={'Accept-Encoding': 'gzip'})),
+            ("br", fetch(headers={'Accept-Encoding': 'br'})),
+            ("top_k=20 + gzip", fetch('?top_k=20', {'Accept-Encoding': 'gzip'})),
+            ("GET If-None-Match", client.get('/analyze', query_string={'keyword': form['keyword'], 'temperature': form['temperature']}, headers={'If-None-Match': etag}))
+        ]
+
+        full_size = len(baseline.get_data())
+        print(f"{'response':<22} {'status':>6} {'encoding':>9} {'bytes':>8} {'vs full':>8}")
+        for name, response in cases:
+            size = len(response.get_data())
+            encoding = response.headers.get('Content-Encoding', '-')
+            print(f"{name:<22} {response.status_code:>6} {encoding:>9} {size:>8} {size / full_size:>7.1%}")
+    finally:
+        shutil.rmtree(instructions_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /analyze with local stand-ins: requests/sec per worker count, or payload sizes")
+    parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated gunicorn worker counts")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per worker")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent client threads")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per measurement")
+    parser.add_argument('--payload-sizes', action='store_true', help="Report /analyze payload sizes per response option instead")
+    args = parser.parse_args()
+
+    if args.payload_sizes:
+        report_payload_sizes()
+        return
+
+    print(f"{'workers':>8} {'threads':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for workers in [int(w) for w in args.workers.split(',')]:
+        stats = run_with_workers(workers, args.threads, args.concurrency, args.duration)
+        print(f"{workers:>8} {args.threads:>8} {stats['requests']:>9} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
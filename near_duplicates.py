@@ -0,0 +1,141 @@
+import re
+import random
+import hashlib
+from bisect import bisect_left
+from typing import List, Tuple, Dict
+
+# Mersenne prime used for the universal hash family
+_MAX_HASH = (1 << 61) - 1
+
+# Marks Google appends when it cuts a title short
+TRUNCATION_MARKS = ('...', '…')
+
+
+class NearDuplicateDetector:
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 1, min_prefix_length: int = 20):
+        """Set up MinHash permutations and LSH banding for near-duplicate detection."""
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_prefix_length = min_prefix_length
+
+        # Fixed seed so the same titles always collapse the same way
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _MAX_HASH), rng.randrange(0, _MAX_HASH))
+            for _ in range(num_perm)
+        ]
+
+    def normalize(self, text: str) -> str:
+        """Casefold a title and drop punctuation and truncation marks, keeping all scripts."""
+        text = text.casefold().rstrip('.… ')
+        return re.sub(r'[\W_]+', ' ', text).strip()
+
+    def shingles(self, text: str) -> set:
+        """Return the set of character shingles for a normalized title."""
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, shingles: set) -> List[int]:
+        """Compute the MinHash signature of a shingle set."""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+            for s in shingles
+        ]
+        return [
+            min((a * h + b) % _MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        ]
+
+    def estimate_similarity(self, sig_a: List[int], sig_b: List[int]) -> float:
+        """Estimate Jaccard similarity from two MinHash signatures."""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / self.num_perm
+
+    def collapse(self, entries: List[Tuple[str, str]]) -> Tuple[List[int], int]:
+        """Collapse near-identical (title, domain) entries, keeping the highest-ranked of each group.
+
+        Only titles from the same domain are merged, and titles with no letters
+        or digits are never merged. A truncated title ("...") is merged with the
+        one same-domain title that starts with it; other titles are merged when
+        their estimated Jaccard similarity reaches the threshold. Returns the
+        indices of the surviving entries in their original order and how many
+        were merged.
+        """
+        texts: Dict[int, str] = {}
+        truncated = []
+        signatures = {}
+        buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+        for index, (title, domain) in enumerate(entries):
+            text = self.normalize(title)
+            if not text:
+                continue
+            texts[index] = text
+            if title.rstrip().endswith(TRUNCATION_MARKS):
+                truncated.append(index)
+            sig = self.signature(self.shingles(text))
+            signatures[index] = sig
+            for band in range(self.bands):
+                key = (domain, band, tuple(sig[band * self.rows:(band + 1) * self.rows]))
+                buckets.setdefault(key, []).append(index)
+
+        # Union-find over candidate pairs that share a domain and at least one band
+        parent = list(range(len(entries)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a: int, b: int):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                # Lower index wins so the earliest result represents the group
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        # Truncation drops too many shingles for Jaccard to catch, so match
+        # truncated titles by prefix against the sorted titles of their domain
+        sorted_by_domain: Dict[str, List[Tuple[str, int]]] = {}
+        for index, text in texts.items():
+            sorted_by_domain.setdefault(entries[index][1], []).append((text, index))
+        for items in sorted_by_domain.values():
+            items.sort()
+        for index in truncated:
+            prefix = texts[index]
+            if len(prefix) < self.min_prefix_length:
+                continue
+            items = sorted_by_domain[entries[index][1]]
+            matches = []
+            for text, other in items[bisect_left(items, (prefix, -1)):]:
+                if not text.startswith(prefix):
+                    break
+                if other != index and text != prefix:
+                    matches.append(other)
+                    if len(matches) > 1:
+                        break
+            # An ambiguous prefix could belong to either title, so leave it alone
+            if len(matches) == 1:
+                union(index, matches[0])
+
+        checked = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Comparing neighbours keeps the work linear in bucket size
+            for previous, current in zip(members, members[1:]):
+                pair = (previous, current)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if self.estimate_similarity(signatures[previous], signatures[current]) >= self.threshold:
+                    union(previous, current)
+
+        kept = [index for index in range(len(entries)) if find(index) == index]
+        return kept, len(entries) - len(kept)
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+# Brotli is optional; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ANALYSIS_FIELDS = (
+    'keyword',
+    'num_titles_analyzed',
+    'num_duplicates_merged',
+    'top_terms',
+    'term_frequency',
+    'analyzed_titles',
+    'instructions_version',
+    'gpt4_title',
+    'claude_title'
+)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+def parse_options(values) -> Tuple[Optional[int], Optional[List[str]]]:
+    """Read `top_k` and `fields` from request values; raise ValueError if invalid."""
+    top_k = values.get('top_k')
+    if top_k not in (None, ''):
+        try:
+            top_k = int(top_k)
+        except (TypeError, ValueError):
+            raise ValueError("top_k must be a non-negative integer")
+        if top_k < 0:
+            raise ValueError("top_k must be a non-negative integer")
+    else:
+        top_k = None
+
+    fields = values.get('fields')
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in ANALYSIS_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        fields = None
+
+    return top_k, fields
+
+
+def shape_payload(response: Dict, top_k: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict:
+    """Apply the top-K term cap and field selection to an /analyze response."""
+    payload = dict(response)
+    if top_k is not None and 'term_frequency' in payload:
+        top = sorted(payload['term_frequency'].items(), key=lambda item: item[1], reverse=True)[:top_k]
+        payload['term_frequency'] = dict(top)
+    if fields is not None:
+        payload = {field: payload[field] for field in fields if field in payload}
+    return payload
+
+
+def make_etag(body: bytes, encoding: Optional[str] = None) -> str:
+    """Strong ETag for a serialized body, distinct for each content-coding of it."""
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def choose_encoding(body: bytes, accept_encodings) -> Optional[str]:
+    """Pick the best content-coding the client accepts (br, then gzip), or None."""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(offered)
+
+
+def compress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Apply a content-coding chosen by choose_encoding."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
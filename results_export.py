@@ -0,0 +1,191 @@
+import os
+import csv
+import argparse
+from typing import Dict, List
+from dotenv import load_dotenv
+
+from title_analyzer import split_title, is_generated_title
+
+# pyarrow is optional; without it results are exported as chunked CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Column layout of each exported table. serp.position is the 1-based position
+# among the analyzed titles, i.e. after exclusion rules and near-duplicate
+# collapsing, not the raw Google rank.
+TABLES = {
+    'keywords': [
+        ('keyword', 'string'),
+        ('num_titles_analyzed', 'int32'),
+        ('num_duplicates_merged', 'int32'),
+        ('gpt4_title', 'string'),
+        ('claude_title', 'string'),
+        ('instructions_version', 'string')
+    ],
+    'serp': [
+        ('keyword', 'string'),
+        ('position', 'int32'),
+        ('title', 'string'),
+        ('domain', 'string')
+    ],
+    'terms': [
+        ('keyword', 'string'),
+        ('term', 'string'),
+        ('count', 'int32'),
+        ('top_rank', 'int32')
+    ]
+}
+
+
+def generated_title(results: Dict, key: str):
+    """The generated title under `key`, or None for placeholders and errors."""
+    title = results.get(key)
+    return title if is_generated_title(title) else None
+
+
+def results_to_rows(results: Dict) -> Dict[str, List[tuple]]:
+    """Flatten one analysis result into rows for each exported table."""
+    keyword = results["keyword"]
+    top_ranks = {term: rank for rank, term in enumerate(results["top_terms"], start=1)}
+    return {
+        'keywords': [(
+            keyword,
+            results["num_titles_analyzed"],
+            results.get("num_duplicates_merged", 0),
+            generated_title(results, "gpt4_title"),
+            generated_title(results, "claude_title"),
+            results.get("instructions_version")
+        )],
+        'serp': [
+            (keyword, position, *split_title(title))
+            for position, title in enumerate(results["analyzed_titles"], start=1)
+        ],
+        'terms': [
+            (keyword, term, count, top_ranks.get(term))
+            for term, count in sorted(results["term_frequency"].items(), key=lambda item: item[1], reverse=True)
+        ]
+    }
+
+
+class ResultsExporter:
+    def __init__(self, directory: str, format: str = None, row_group_size: int = 10000):
+        """Stream analysis results into one file per table, flushing every `row_group_size` rows.
+
+        `format` is 'parquet' (requires pyarrow) or 'csv'; by default Parquet is
+        used when pyarrow is installed. Memory use is bounded by the row group size.
+        """
+        if format is None:
+            format = 'parquet' if pa is not None else 'csv'
+        if format == 'parquet' and pa is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        if format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported export format: {format}")
+
+        self.directory = directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self._buffers = {table: [] for table in TABLES}
+        self._writers = {}
+        self._files = {}
+        self.rows_written = {table: 0 for table in TABLES}
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{table}.{self.format}")
+
+    def add(self, results: Dict):
+        """Buffer one keyword's results, writing out any table whose buffer is full."""
+        for table, rows in results_to_rows(results).items():
+            self._buffers[table].extend(rows)
+            # Write full row groups only, so every group but the last is the same size
+            while len(self._buffers[table]) >= self.row_group_size:
+                self._flush(table, self.row_group_size)
+
+    def _flush(self, table: str, limit: int = None):
+        """Write up to `limit` buffered rows of a table (all of them by default)."""
+        buffer = self._buffers[table]
+        rows = buffer[:limit] if limit is not None else buffer
+        if not rows:
+            return
+        columns = TABLES[table]
+
+        if self.format == 'parquet':
+            if table not in self._writers:
+                schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+                self._writers[table] = pq.ParquetWriter(self.path(table), schema, compression='zstd')
+            writer = self._writers[table]
+            arrays = [
+                pa.array([row[i] for row in rows], type=writer.schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema), row_group_size=self.row_group_size)
+        else:
+            if table not in self._writers:
+                f = open(self.path(table), 'w', newline='', encoding='utf-8')
+                self._files[table] = f
+                self._writers[table] = csv.writer(f)
+                self._writers[table].writerow([name for name, _ in columns])
+            self._writers[table].writerows(rows)
+            self._files[table].flush()
+
+        self.rows_written[table] += len(rows)
+        self._buffers[table] = buffer[len(rows):]
+
+    def close(self):
+        """Write any buffered rows and close every file."""
+        for table in TABLES:
+            self._flush(table)
+        if self.format == 'parquet':
+            for writer in self._writers.values():
+                writer.close()
+        for f in self._files.values():
+            f.close()
+        self._writers = {}
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a list of keywords and export the results in columnar form")
+    parser.add_argument('keywords_file', help="Text file with one keyword per line")
+    parser.add_argument('--out', default='exports', help="Output directory")
+    parser.add_argument('--format', choices=['parquet', 'csv'], default=None, help="Defaults to parquet when pyarrow is installed")
+    parser.add_argument('--row-group-size', type=int, default=10000)
+    parser.add_argument('--temperature', type=float, default=0.4)
+    args = parser.parse_args()
+
+    from title_analyzer import TitleAnalyzer
+    from instruction_store import InstructionStore
+
+    load_dotenv()
+    analyzer = TitleAnalyzer(os.getenv('OPENAI_API_KEY'), os.getenv('ANTHROPIC_API_KEY'))
+    template = InstructionStore().current()
+
+    try:
+        with open(args.keywords_file, 'r') as keywords, ResultsExporter(args.out, args.format, args.row_group_size) as exporter:
+            for line in keywords:
+                keyword = line.strip()
+                if not keyword:
+                    continue
+                results = analyzer.run_analysis(keyword, args.temperature, template.text)
+                results["instructions_version"] = template.version
+                exporter.add(results)
+        print(f"\nExported to {args.out} ({exporter.format}):")
+        for table, count in exporter.rows_written.items():
+            print(f"- {table}: {count} rows")
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import pytest
+
+from app import create_app
+
+
+class StubAnalyzer:
+    def __init__(self, gpt4_title="Best Running Shoes for Every Runner"):
+        self.gpt4_title = gpt4_title
+        self.runs = 0
+
+    def run_analysis(self, keyword, temperature=0.4, instructions=None):
+        self.runs += 1
+        titles = [f"{keyword} guide number {i} with plenty of words (example{i}.com)" for i in range(30)]
+        return {
+            "keyword": keyword,
+            "num_titles_analyzed": len(titles),
+            "num_duplicates_merged": 0,
+            "top_terms": ["guide"],
+            "term_frequency": {"guide": 30, "words": 30, "plenty": 30},
+            "analyzed_titles": titles,
+            "gpt4_title": self.gpt4_title,
+            "claude_title": "Anthropic API key not provided"
+        }
+
+    def close(self):
+        pass
+
+
+def make_client(tmp_path, analyzer):
+    app = create_app({'INSTRUCTIONS_DIR': str(tmp_path)}, analyzer=analyzer)
+    instructions = app.extensions['instruction_store'].default().text
+    return app.test_client(), {'keyword': 'running shoes', 'temperature': '0.4', 'instructions': instructions}
+
+
+def test_post_always_runs_and_get_revalidates_from_cache(tmp_path):
+    analyzer = StubAnalyzer()
+    client, form = make_client(tmp_path, analyzer)
+    query = {'keyword': form['keyword'], 'temperature': form['temperature']}
+
+    posted = client.post('/analyze', data=form)
+    etag = posted.headers['ETag']
+    assert posted.status_code == 200
+
+    # POST ignores If-None-Match (304 is only allowed for GET/HEAD)
+    assert client.post('/analyze', data=form, headers={'If-None-Match': etag}).status_code == 200
+    assert analyzer.runs == 2
+
+    not_modified = client.get('/analyze', query_string=query, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    assert 'Accept-Encoding' in not_modified.headers['Vary']
+
+    fetched = client.get('/analyze', query_string=query)
+    assert fetched.status_code == 200
+    assert fetched.headers['ETag'] == etag
+    assert analyzer.runs == 2
+
+
+def test_compressed_representation_has_its_own_etag(tmp_path):
+    client, form = make_client(tmp_path, StubAnalyzer())
+    identity = client.post('/analyze', data=form).headers['ETag']
+    compressed = client.post('/analyze', data=form, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] != identity
+
+    query = {'keyword': form['keyword'], 'temperature': form['temperature']}
+    # The identity tag doesn't validate the gzip representation
+    assert client.get('/analyze', query_string=query, headers={'If-None-Match': identity, 'Accept-Encoding': 'gzip'}).status_code == 200
+
+
+def test_failed_generation_is_not_cached(tmp_path):
+    client, form = make_client(tmp_path, StubAnalyzer(gpt4_title="Error generating title with GPT-4"))
+    client.post('/analyze', data=form)
+    assert client.get('/analyze', query_string={'keyword': form['keyword'], 'temperature': form['temperature']}).status_code == 404
+
+
+@pytest.mark.parametrize("top_k", ["abc", "-3"])
+def test_bad_top_k_is_rejected(tmp_path, top_k):
+    client, form = make_client(tmp_path, StubAnalyzer())
+    response = client.post(f'/analyze?top_k={top_k}', data=form)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "top_k must be a non-negative integer"}
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from exclusion_rules import ExclusionRules
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'exclusion_rules.json')
+SHIPPED = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'exclusion_rules.json')
+
+TITLES = [
+    "People also ask",
+    "IMAGES",
+    "Results for Boston, MA",
+    "Results format explained",
+    "Top 10 running shoes - Sponsored",
+    "Nutzer fragen auch",
+    "Ergebnisse für Berlin",
+    "How to choose running shoes"
+]
+
+
+def test_default_rules_filter_in_one_pass():
+    rules = ExclusionRules.load(FIXTURE)
+    kept, dropped = rules.filter(TITLES)
+    assert kept == [
+        "Results format explained",
+        "Nutzer fragen auch",
+        "Ergebnisse für Berlin",
+        "How to choose running shoes"
+    ]
+    assert dropped == {
+        "exact:people also ask": 1,
+        "exact:images": 1,
+        "prefix:results for ": 1,
+        "regex:.*\\bsponsored\\b": 1
+    }
+
+
+def test_locale_rules_extend_the_defaults():
+    rules = ExclusionRules.load(FIXTURE, 'de')
+    kept, dropped = rules.filter(TITLES)
+    assert kept == ["Results format explained", "How to choose running shoes"]
+    assert dropped["exact:nutzer fragen auch"] == 1
+    assert dropped["prefix:ergebnisse für "] == 1
+    assert dropped["exact:people also ask"] == 1
+
+
+def test_counts_accumulate_across_match_and_filter():
+    rules = ExclusionRules.load(FIXTURE)
+    assert rules.match("  People\nalso   ask ") == "exact:people also ask"
+    assert rules.match("How to choose running shoes") is None
+    rules.filter(["People also ask", "Images"])
+    assert rules.stats() == {"exact:people also ask": 2, "exact:images": 1}
+
+
+@pytest.mark.parametrize("pattern", [r"(?i)ads", r"(?P<r0>ads)", r"(unclosed", r"(\w+) \1", r"(ad)?(?(1)s|x)"])
+def test_invalid_regex_rules_raise_value_error(pattern):
+    with pytest.raises(ValueError, match="Invalid exclusion regex"):
+        ExclusionRules({"exact": ["images"], "regex": [pattern]})
+
+
+def test_scoped_flags_and_plain_groups_are_allowed():
+    rules = ExclusionRules({"regex": [r"(?i:ad|ads)\b", r"(shop|store) results"]})
+    assert rules.match("ads here") == r"regex:(?i:ad|ads)\b"
+    assert rules.match("store results") == "regex:(shop|store) results"
+
+
+def test_escaped_backslash_before_a_digit_is_not_a_backreference():
+    rules = ExclusionRules({"regex": [r"c:\\1 drive"]})
+    assert rules.match(r"C:\1 drive") == r"regex:c:\\1 drive"
+
+
+def test_shipped_rules_keep_organic_results():
+    rules = ExclusionRules.load(SHIPPED)
+    assert rules.match("Deals on basketball shoes") == "exact:deals on basketball shoes"
+    assert rules.match("Deals on Running Shoes | Nike.com") is None
+    assert rules.match("Results for Boston, MA") == "prefix:results for "
@@ -0,0 +1,113 @@
+from instruction_store import InstructionStore
+from keyword_tracker import KeywordTracker, FAILURE_BACKOFF_SECONDS, diff_fingerprints, serp_fingerprint
+
+
+def serp(titles, top_terms=("running", "shoes")):
+    return {"keyword": "running shoes", "analyzed_titles": list(titles), "top_terms": list(top_terms), "term_frequency": {}}
+
+
+TITLES = [f"Result {i} (site{i}.com)" for i in range(10)]
+
+
+class StubAnalyzer:
+    def __init__(self, titles=TITLES, gpt4_title="A Real Title"):
+        self.titles = list(titles)
+        self.gpt4_title = gpt4_title
+        self.generations = 0
+
+    def analyze_serp(self, keyword):
+        return serp(self.titles)
+
+    def generate_titles(self, results, temperature=0.4, instructions=None):
+        self.generations += 1
+        results["gpt4_title"] = self.gpt4_title
+        results["claude_title"] = "Anthropic API key not provided"
+        return results
+
+
+def make_tracker(tmp_path, analyzer):
+    tracker = KeywordTracker(analyzer, str(tmp_path / 'tracked.json'), InstructionStore(str(tmp_path)))
+    tracker.track("running shoes", interval_hours=24)
+    return tracker
+
+
+def test_identical_serps_score_zero():
+    fingerprint = serp_fingerprint(serp(TITLES))
+    diff = diff_fingerprints(fingerprint, fingerprint)
+    assert diff["score"] == 0
+    assert diff["new_results"] == diff["dropped_results"] == diff["moved_results"] == []
+
+
+def test_new_dropped_and_moved_results_are_scored():
+    old = serp_fingerprint(serp(TITLES))
+
+    # Two results replaced: 2 new + 2 dropped out of 10
+    replaced = serp_fingerprint(serp(TITLES[:8] + ["New A (a.com)", "New B (b.com)"]))
+    diff = diff_fingerprints(old, replaced)
+    assert diff["new_results"] == ["a.com", "b.com"]
+    assert diff["dropped_results"] == ["site8.com", "site9.com"]
+    assert diff["score"] == 0.4
+
+    # Swapping neighbours is within the move tolerance; jumping 9 places is a move
+    assert diff_fingerprints(old, serp_fingerprint(serp([TITLES[1], TITLES[0]] + TITLES[2:])))["score"] == 0
+    jumped = diff_fingerprints(old, serp_fingerprint(serp([TITLES[9]] + TITLES[:9])))
+    assert jumped["moved_results"] == [{"domain": "site9.com", "from": 10, "to": 1}]
+    assert jumped["score"] == 0.05
+
+
+def test_top_term_shifts_are_scored():
+    old = serp_fingerprint(serp(TITLES, ["running", "shoes", "best", "women"]))
+    new = serp_fingerprint(serp(TITLES, ["running", "shoes", "trail", "men"]))
+    diff = diff_fingerprints(old, new)
+    assert diff["terms_added"] == ["trail", "men"]
+    assert diff["terms_removed"] == ["best", "women"]
+    assert diff["score"] == 0.5
+
+
+def test_small_changes_skip_generation(tmp_path):
+    analyzer = StubAnalyzer()
+    tracker = make_tracker(tmp_path, analyzer)
+    assert tracker.check("running shoes")["reason"] == "first check"
+
+    analyzer.titles = [TITLES[1], TITLES[0]] + TITLES[2:]
+    report = tracker.check("running shoes")
+    assert not report["regenerated"]
+    assert analyzer.generations == 1
+
+
+def test_failed_generation_is_not_stored_and_is_retried(tmp_path):
+    analyzer = StubAnalyzer(gpt4_title="Error generating title with GPT-4")
+    tracker = make_tracker(tmp_path, analyzer)
+
+    report = tracker.check("running shoes")
+    assert report["reason"] == "generation failed"
+    entry = tracker.keywords["running shoes"]
+    assert entry["fingerprint"] is None
+    assert entry["titles"] == {}
+    assert "instructions_version" not in entry
+
+    # Retried after the backoff, and a successful generation is then stored
+    assert tracker.due_keywords(entry["last_failed"] + 60) == []
+    assert tracker.due_keywords(entry["last_failed"] + FAILURE_BACKOFF_SECONDS) == ["running shoes"]
+    analyzer.gpt4_title = "A Real Title"
+    assert tracker.check("running shoes")["regenerated"]
+    assert tracker.keywords["running shoes"]["titles"]["gpt4_title"] == "A Real Title"
+    assert analyzer.generations == 2
+
+
+def test_failed_scrape_backs_off_instead_of_retrying_every_poll(tmp_path):
+    analyzer = StubAnalyzer(titles=[])
+    tracker = make_tracker(tmp_path, analyzer)
+    assert tracker.check("running shoes") is None
+
+    failed_at = tracker.keywords["running shoes"]["last_failed"]
+    assert tracker.due_keywords(failed_at + 300) == []
+    assert tracker.due_keywords(failed_at + FAILURE_BACKOFF_SECONDS) == ["running shoes"]
+
+
+def test_backoff_never_exceeds_the_interval(tmp_path):
+    tracker = make_tracker(tmp_path, StubAnalyzer(titles=[]))
+    tracker.track("running shoes", interval_hours=0.25)
+    tracker.check("running shoes")
+    failed_at = tracker.keywords["running shoes"]["last_failed"]
+    assert tracker.due_keywords(failed_at + 15 * 60) == ["running shoes"]
@@ -0,0 +1,78 @@
+from near_duplicates import NearDuplicateDetector
+
+
+def collapse(entries):
+    kept, merged = NearDuplicateDetector().collapse(entries)
+    return [entries[index] for index in kept], merged
+
+
+def test_truncated_copies_of_one_article_are_merged():
+    entries = [
+        ("How to Choose Running Shoes: A Complete Guide for Beginners", "runnersworld.com"),
+        ("How to Choose Running Shoes: A Complete Guide for Beginn...", "runnersworld.com"),
+        ("10 Best Trail Running Shoes of 2024", "outsideonline.com")
+    ]
+    kept, merged = collapse(entries)
+    assert merged == 1
+    assert kept == [entries[0], entries[2]]
+
+
+def test_similar_but_different_titles_are_kept():
+    entries = [
+        ("Best running shoes for women", "example.com"),
+        ("Best running shoes for men", "example.com"),
+        ("Nike Air Max (Men's)", "nike.com"),
+        ("Nike Air Max (Women's)", "nike.com")
+    ]
+    assert collapse(entries) == (entries, 0)
+
+
+def test_same_title_on_different_domains_is_kept():
+    entries = [("Running Shoes", "nike.com"), ("Running Shoes", "adidas.com")]
+    assert collapse(entries) == (entries, 0)
+
+
+def test_non_ascii_titles_are_not_collapsed_together():
+    entries = [
+        ("ランニングシューズの選び方", "example.jp"),
+        ("初心者におすすめのスニーカー", "example.jp"),
+        ("Как выбрать кроссовки для бега", "example.jp"),
+        ("Laufschuhe Größe Übersicht", "example.jp")
+    ]
+    assert collapse(entries) == (entries, 0)
+    assert NearDuplicateDetector().normalize("Größe Übersicht") == "grösse übersicht"
+
+
+def test_titles_without_letters_or_digits_are_never_merged():
+    entries = [("...", "example.com"), ("—", "example.com"), ("!!!", "example.com")]
+    assert collapse(entries) == (entries, 0)
+
+
+def serp_truncate(title, limit=60):
+    """Cut a title the way Google does: at a word boundary near `limit`, plus "..."."""
+    return title[:limit].rsplit(' ', 1)[0] + " ..."
+
+
+def test_titles_truncated_at_serp_cutoff_are_merged():
+    full = "The 12 Best Running Shoes for Beginners in 2024, Tested and Reviewed by Our Experts"
+    entries = [
+        (serp_truncate(full), "runnersworld.com"),
+        ("Trail Running Shoes: Everything You Need to Know", "runnersworld.com"),
+        (full, "runnersworld.com")
+    ]
+    kept, merged = collapse(entries)
+    assert merged == 1
+    assert kept == entries[:2]
+
+
+def test_truncated_title_is_not_merged_across_domains_or_when_ambiguous():
+    full = "The 12 Best Running Shoes for Beginners in 2024, Tested and Reviewed by Our Experts"
+    other = "The 12 Best Running Shoes for Beginners in 2024, Ranked by Price and Comfort Level"
+    truncated = serp_truncate(full, 45)
+    assert collapse([(truncated, "a.com"), (full, "b.com")])[1] == 0
+    assert collapse([(truncated, "a.com"), (full, "a.com"), (other, "a.com")])[1] == 0
+
+
+def test_short_truncated_prefixes_are_not_merged():
+    entries = [("Best shoes ...", "example.com"), ("Best shoes for flat feet and overpronation", "example.com")]
+    assert collapse(entries) == (entries, 0)
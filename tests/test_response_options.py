@@ -0,0 +1,46 @@
+import gzip
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_accept_header
+from werkzeug.datastructures import Accept
+
+from response_options import parse_options, shape_payload, make_etag, choose_encoding, compress_body
+
+
+def test_parse_options():
+    assert parse_options(MultiDict()) == (None, None)
+    assert parse_options(MultiDict({'top_k': '20', 'fields': 'keyword, top_terms'})) == (20, ['keyword', 'top_terms'])
+
+
+@pytest.mark.parametrize("values, message", [
+    ({'top_k': 'abc'}, "top_k must be a non-negative integer"),
+    ({'top_k': '-1'}, "top_k must be a non-negative integer"),
+    ({'fields': 'keyword,nope'}, "Unknown fields: nope")
+])
+def test_parse_options_rejects_bad_input(values, message):
+    with pytest.raises(ValueError, match=message):
+        parse_options(MultiDict(values))
+
+
+def test_shape_payload_caps_terms_and_selects_fields():
+    response = {"keyword": "k", "top_terms": ["a"], "term_frequency": {"a": 3, "b": 1, "c": 2}}
+    assert shape_payload(response, top_k=2)["term_frequency"] == {"a": 3, "c": 2}
+    assert shape_payload(response, fields=["keyword"]) == {"keyword": "k"}
+    assert shape_payload(response) == response
+
+
+def test_each_content_coding_gets_its_own_etag():
+    body = b'{"keyword": "running shoes"}' * 50
+    identity = make_etag(body)
+    assert make_etag(body, 'gzip') == f"{identity}-gzip"
+    assert len({identity, make_etag(body, 'gzip'), make_etag(body, 'br')}) == 3
+
+
+def test_compression_is_negotiated():
+    body = b'x' * 1000
+    accept = parse_accept_header('gzip, deflate', Accept)
+    assert choose_encoding(body, accept) == 'gzip'
+    assert gzip.decompress(compress_body(body, 'gzip')) == body
+    assert choose_encoding(b'small', accept) is None
+    assert choose_encoding(body, parse_accept_header('', Accept)) is None
@@ -1,4 +1,5 @@
 import json
+import re
 from collections import Counter
 import nltk
 import ssl
@@ -20,6 +21,10 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 from urllib.parse import urlparse
 import random
+import threading
+import weakref
+from near_duplicates import NearDuplicateDetector
+from exclusion_rules import ExclusionRules
 
 # Load environment variables
 load_dotenv()
@@ -56,8 +61,36 @@ def download_nltk_data():
 # Download all required NLTK data
 download_nltk_data()
 
+# get_search_results appends the result's domain as " (example.com)"
+DOMAIN_SUFFIX = re.compile(r'^(.*) \(([^\s()]+\.[^\s()]+)\)$', re.DOTALL)
+
+# SERP widget headings and other non-result titles to skip
+EXCLUSION_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exclusion_rules.json')
+
+# Placeholders returned instead of a generated title
+TITLE_SENTINELS = {
+    "OpenAI API key not provided",
+    "Anthropic API key not provided",
+    "No titles found to analyze",
+    "Error generating title with GPT-4",
+    "Error generating title with Claude",
+    "Error: Claude did not generate a title"
+}
+
+def is_generated_title(title: str) -> bool:
+    """True if `title` is a real generated title rather than a placeholder or error."""
+    return bool(title) and title not in TITLE_SENTINELS
+
+def split_title(title: str) -> Tuple[str, str]:
+    """Split a scraped "Title (domain)" string into its title and domain."""
+    match = DOMAIN_SUFFIX.match(title)
+    if match:
+        return match.group(1), match.group(2)
+    return title, ''
+
 class TitleAnalyzer:
-    def __init__(self, openai_key: str = None, anthropic_key: str = None):
+    def __init__(self, openai_key: str = None, anthropic_key: str = None, locale: str = 'en',
+                 exclusion_rules_path: str = None):
         """Initialize the TitleAnalyzer with available API keys."""
         self.openai_key = openai_key
         self.anthropic_key = anthropic_key
@@ -65,10 +98,41 @@ class TitleAnalyzer:
         # Add custom stop words relevant for titles
         self.stop_words.update(['|', '-', '2025', '2024', '2023', 'best', 'top', 'guide'])
         
+        # Shared state guarded for use from multiple request threads
+        self._lock = threading.RLock()
+        self._cookie_lock = threading.Lock()
+        self._active_drivers = set()
+        self._driver_path = None
+        
         # Initialize API clients only if keys are provided
         self.openai_client = None
         self.anthropic_client = None
+        self._create_clients()
+        
+        # Connection pools must not be shared with a forked worker process
+        if hasattr(os, 'register_at_fork'):
+            reset_ref = weakref.WeakMethod(self._reset_after_fork)
+            os.register_at_fork(after_in_child=lambda: reset_ref() and reset_ref()())
+        
+        # Set up Chrome options with minimal configuration
+        self.chrome_options = Options()
+        self.chrome_options.add_argument('--headless=new')  # Start headless by default
+        self.chrome_options.add_argument('--no-sandbox')
+        self.chrome_options.add_argument('--window-size=1920,1080')
+        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
+        
+        # Exclusion rules are compiled once and shared by every search
+        self.exclusion_rules = ExclusionRules.load(exclusion_rules_path or EXCLUSION_RULES_PATH, locale)
         
+        # Shared detector for collapsing near-identical scraped titles
+        self.duplicate_detector = NearDuplicateDetector()
+        
+        # Create a directory for cookies if it doesn't exist
+        if not os.path.exists('browser_data'):
+            os.makedirs('browser_data')
+
+    def _create_clients(self):
+        """Create the API clients for the keys that were provided."""
         print("\nInitializing API clients:")
         if self.openai_key:
             print("- Setting up OpenAI client")
@@ -81,33 +145,72 @@ class TitleAnalyzer:
             self.anthropic_client = Anthropic(api_key=self.anthropic_key)
         else:
             print("- Anthropic client not initialized (no API key)")
+
+    def _reset_after_fork(self):
+        """Give a forked child its own locks and API clients."""
+        # Locks may have been held by another thread at fork time, and the
+        # browsers belong to the parent, so neither can be reused here
+        self._lock = threading.RLock()
+        self._cookie_lock = threading.Lock()
+        self._active_drivers = set()
+        self._create_clients()
+
+    def _start_driver(self, options: Options):
+        """Start a Chrome WebDriver and track it so close() can shut it down."""
+        with self._lock:
+            # Resolve the driver binary once instead of on every search
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            service = Service(self._driver_path)
+        driver = webdriver.Chrome(service=service, options=options)
+        with self._lock:
+            self._active_drivers.add(driver)
+        return driver
+
+    def _quit_driver(self, driver):
+        """Quit a WebDriver and stop tracking it."""
+        with self._lock:
+            self._active_drivers.discard(driver)
+        try:
+            driver.quit()
+        except:
+            pass
+
+    def close(self):
+        """Shut down any open browsers and close the API clients' connections."""
+        with self._lock:
+            drivers = list(self._active_drivers)
+            self._active_drivers.clear()
+            clients = [self.openai_client, self.anthropic_client]
         
-        # Set up Chrome options with minimal configuration
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--headless=new')  # Start headless by default
-        self.chrome_options.add_argument('--no-sandbox')
-        self.chrome_options.add_argument('--window-size=1920,1080')
-        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
+        for driver in drivers:
+            try:
+                driver.quit()
+            except:
+                pass
         
-        # Create a directory for cookies if it doesn't exist
-        if not os.path.exists('browser_data'):
-            os.makedirs('browser_data')
+        for client in clients:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"Error closing API client: {e}")
 
     def get_search_results(self, keyword: str, num_results: int = 100) -> List[str]:
         """Fetch search results by scraping Google."""
         print(f"Scraping Google results for: {keyword}")
         
         # Initialize the Chrome WebDriver
+        driver = None
         try:
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=self.chrome_options)
+            driver = self._start_driver(self.chrome_options)
             
             # Load cookies if they exist
             cookies_file = 'browser_data/google_cookies.json'
             if os.path.exists(cookies_file):
                 print("Loading saved cookies...")
                 driver.get('https://www.google.com')
-                with open(cookies_file, 'r') as f:
+                with self._cookie_lock, open(cookies_file, 'r') as f:
                     cookies = json.load(f)
                     for cookie in cookies:
                         try:
@@ -125,11 +228,11 @@ class TitleAnalyzer:
                 print("\nCaptcha detected! Opening browser for manual verification...")
                 
                 # Recreate driver without headless mode
-                driver.quit()
+                self._quit_driver(driver)
                 visible_options = Options()
                 visible_options.add_argument('--start-maximized')
                 visible_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
-                driver = webdriver.Chrome(service=service, options=visible_options)
+                driver = self._start_driver(visible_options)
                 
                 # Navigate to search URL
                 driver.get(search_url)
@@ -168,13 +271,12 @@ class TitleAnalyzer:
                 
                 if not captcha_solved:
                     print("\nTimeout waiting for captcha solution. Please try again.")
-                    driver.quit()
                     return []
                 
                 # Save cookies for future use
                 print("Saving cookies for future sessions...")
                 cookies = driver.get_cookies()
-                with open(cookies_file, 'w') as f:
+                with self._cookie_lock, open(cookies_file, 'w') as f:
                     json.dump(cookies, f)
             
             # Try multiple selectors for titles
@@ -185,70 +287,18 @@ class TitleAnalyzer:
                 'div[role="heading"]'  # Another common selector
             ]
             
-            # List of titles to exclude
-            excluded_titles = {
-                'popular products',
-                'people also ask',
-                'more products',
-                'fast pickup or delivery',
-                'in stores nearby',
-                'deals on basketball shoes',
-                'images',
-                'discussions and forums',
-                'shopping results',
-                'related searches',
-                'top stories',
-                'videos',
-                'news',
-                'maps',
-                'books',
-                'flights',
-                'hotels',
-                'finance',
-                'all',
-                'shopping',
-                'news',
-                'videos',
-                'images',
-                'maps',
-                'books',
-                'flights',
-                'finance',
-                'all filters',
-                'reviews',
-                'refine results',
-                'sponsored',
-                'login',
-                'what people are saying',
-                'people also search for',
-                'more places',
-                'map',
-                'places',
-                'results for',  # This will catch "Results for *"
-                'ai overview',
-                'description',
-                'also in the news',
-                'news about',  # This will catch "News about *"
-                'shopping ideas',
-                'players',
-                'profiles',
-                'people also search for view 10+ more',
-                'for context',
-                'short videos',
-                'overview',
-                'latest posts'
-            }
-            
             titles = []
+            excluded = Counter()
             for selector in title_selectors:
                 try:
                     elements = driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
                         print(f"Found {len(elements)} titles with selector: {selector}")
                         for elem in elements:
-                            title_text = elem.text.strip().lower()
-                            # Skip if title is in excluded list
-                            if title_text in excluded_titles:
+                            # Skip widget headings and other non-result titles
+                            rule = self.exclusion_rules.match(elem.text)
+                            if rule:
+                                excluded[rule] += 1
                                 continue
                             if elem.text:
                                 # Try to find the parent anchor tag that contains the href
@@ -271,6 +321,11 @@ class TitleAnalyzer:
                     print(f"Error with selector {selector}: {str(e)}")
                     continue
             
+            if excluded:
+                print(f"Excluded {sum(excluded.values())} titles:")
+                for rule, count in excluded.most_common():
+                    print(f"- {rule}: {count}")
+            
             # Remove duplicates while preserving order
             titles = list(dict.fromkeys(titles))
             print(f"Found {len(titles)} unique titles")
@@ -282,16 +337,26 @@ class TitleAnalyzer:
             return []
             
         finally:
-            try:
-                driver.quit()
-            except:
-                pass
+            if driver is not None:
+                self._quit_driver(driver)
+
+    def collapse_near_duplicates(self, titles: List[str]) -> Tuple[List[str], int]:
+        """Merge near-identical titles (e.g. different truncations of one article)."""
+        try:
+            kept, merged = self.duplicate_detector.collapse([split_title(title) for title in titles])
+            titles = [titles[index] for index in kept]
+            if merged:
+                print(f"Collapsed {merged} near-duplicate titles")
+            return titles, merged
+        except Exception as e:
+            print(f"Error collapsing near-duplicate titles: {e}")
+            return titles, 0
 
     def analyze_titles(self, titles: List[str]) -> Tuple[Dict[str, int], List[str]]:
         """Analyze titles to find common terms and patterns."""
         try:
             # Strip domains from titles before analysis
-            clean_titles = [title.split(' (')[0] for title in titles]
+            clean_titles = [split_title(title)[0] for title in titles]
             
             all_text = ' '.join(clean_titles).lower()
             # Simple word splitting as fallback if NLTK tokenization fails
@@ -396,8 +461,8 @@ class TitleAnalyzer:
             print(f"Error generating title with Claude: {e}")
             return "Error generating title with Claude"
 
-    def run_analysis(self, keyword: str, temperature: float = 0.4, instructions: str = None) -> Dict:
-        """Run the complete analysis and title generation process."""
+    def analyze_serp(self, keyword: str) -> Dict:
+        """Scrape and analyze the SERP for a keyword without generating titles."""
         # Get search results
         print(f"\nStarting analysis for keyword: {keyword}")
         titles = self.get_search_results(keyword)
@@ -407,27 +472,40 @@ class TitleAnalyzer:
             return {
                 "keyword": keyword,
                 "num_titles_analyzed": 0,
+                "num_duplicates_merged": 0,
                 "top_terms": [],
                 "term_frequency": {},
-                "gpt4_title": "No titles found to analyze",
-                "claude_title": "No titles found to analyze",
                 "analyzed_titles": []
             }
 
+        # Collapse near-duplicates so repeated articles don't inflate term counts
+        titles, num_merged = self.collapse_near_duplicates(titles)
+
         # Analyze titles
         print(f"\nAnalyzing {len(titles)} titles...")
         term_frequency, top_terms = self.analyze_titles(titles)
 
-        # Generate new titles based on available APIs
-        print("\nGenerating optimized titles...")
-        results = {
+        return {
             "keyword": keyword,
             "num_titles_analyzed": len(titles),
+            "num_duplicates_merged": num_merged,
             "top_terms": top_terms,
             "term_frequency": term_frequency,
             "analyzed_titles": titles
         }
 
+    def generate_titles(self, results: Dict, temperature: float = 0.4, instructions: str = None) -> Dict:
+        """Add generated titles to the results of analyze_serp."""
+        if not results["analyzed_titles"]:
+            results["gpt4_title"] = "No titles found to analyze"
+            results["claude_title"] = "No titles found to analyze"
+            return results
+
+        # Generate new titles based on available APIs
+        print("\nGenerating optimized titles...")
+        keyword = results["keyword"]
+        top_terms = results["top_terms"]
+
         # Generate titles only if API clients are available
         if self.openai_client:
             results["gpt4_title"] = self.generate_title_with_gpt4(keyword, top_terms, temperature, instructions)
@@ -441,11 +519,17 @@ class TitleAnalyzer:
 
         return results
 
+    def run_analysis(self, keyword: str, temperature: float = 0.4, instructions: str = None) -> Dict:
+        """Run the complete analysis and title generation process."""
+        results = self.analyze_serp(keyword)
+        return self.generate_titles(results, temperature, instructions)
+
 def print_results(results: Dict):
     """Print results in a formatted way"""
     print("\nAnalysis Results")
     print(f"Keyword: {results['keyword']}")
     print(f"Titles Analyzed: {results['num_titles_analyzed']}")
+    print(f"Near-Duplicates Merged: {results.get('num_duplicates_merged', 0)}")
     print("\nTop Terms:")
     for term in results['top_terms']:
         print(f"- {term}: {results['term_frequency'][term]} occurrences")